@@ -2,18 +2,52 @@ import os
 os.environ['GLOG_minloglevel'] = '3'  
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'  
 
-from flask import Flask, render_template, Response, jsonify, send_from_directory, url_for
+# 'development' runs the Werkzeug dev server with threads, 'production' runs gevent
+SERVER_MODE = os.environ.get('BOOTH_SERVER_MODE', 'development')
+INFERENCE_WORKERS = int(os.environ.get('BOOTH_INFERENCE_WORKERS', 2))
+INFERENCE_QUEUE_LIMIT = int(os.environ.get('BOOTH_INFERENCE_QUEUE_LIMIT', 4))
+HOST = os.environ.get('BOOTH_HOST', '0.0.0.0')
+PORT = int(os.environ.get('BOOTH_PORT', 5000))
+# 'gif', 'mp4' or 'off'
+CLIP_FORMAT = os.environ.get('BOOTH_CLIP_FORMAT', 'gif')
+if CLIP_FORMAT not in ('gif', 'mp4', 'off'):
+    raise ValueError(f"Unknown clip format: {CLIP_FORMAT} (choose from gif, mp4, off)")
+CLIP_MAX_BYTES = int(os.environ.get('BOOTH_CLIP_MAX_MB', 8)) * 1024 * 1024
+# 'strip_2x6', 'grid_4x6' or 'postcard'
+STRIP_LAYOUT = os.environ.get('BOOTH_STRIP_LAYOUT', 'strip_2x6')
+RETENTION_INTERVAL = float(os.environ.get('BOOTH_RETENTION_INTERVAL', 60))
+ARCHIVE_AFTER_HOURS = float(os.environ.get('BOOTH_ARCHIVE_AFTER_HOURS', 24))
+SESSIONS_QUOTA_MB = int(os.environ.get('BOOTH_SESSIONS_QUOTA_MB', 0))
+# Path of a landmark recording to append to (see replay_landmarks.py), empty to disable
+RECORD_LANDMARKS = os.environ.get('BOOTH_RECORD_LANDMARKS', '')
+
+if SERVER_MODE == 'production':
+    from gevent import monkey
+    monkey.patch_all()
+
+from flask import Flask, render_template, Response, jsonify, send_from_directory, url_for, request
 from flask_socketio import SocketIO, emit
 import cv2
 import base64
 import numpy as np
 from gesture_detector import GestureDetector
+from gesture_rules import classify_landmarks
+from gestures import GESTURE_CODES
+import booth_state
+from inference_executor import InferenceExecutor, ExecutorBusy
+from clip_recorder import FrameRingBuffer, encode_clip
+from landmark_recorder import LandmarkRecorder
+from congestion import CongestionController
+from countdown_scheduler import CountdownScheduler
 import datetime
+import math
 import time
-from threading import Lock
+import uuid
+import atexit
+from threading import Lock, local
 import logging
-from PIL import Image, ImageDraw, ImageFont
-import io
+from session_retention import RetentionManager
+from strip_layout import compose_strip, layout_geometry, get_layout, slot_count
 
 
 log = logging.getLogger('werkzeug')
@@ -26,42 +60,80 @@ app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024
 socketio = SocketIO(
     app,
     cors_allowed_origins="*",
-    async_mode='threading',
+    async_mode='gevent' if SERVER_MODE == 'production' else 'threading',
     max_http_buffer_size=50 * 1024 * 1024,
     ping_timeout=60,
     ping_interval=25
 )
 
 
-gesture_detector = GestureDetector()
-try:
-    gesture_detector.hands.min_detection_confidence = 0.6
-    gesture_detector.hands.min_tracking_confidence = 0.5
-except:
-    pass
+inference_executor = InferenceExecutor(
+    workers=INFERENCE_WORKERS,
+    queue_limit=INFERENCE_QUEUE_LIMIT,
+    use_gevent=(SERVER_MODE == 'production')
+)
+
+landmark_recorder = None
+if RECORD_LANDMARKS:
+    landmark_recorder = LandmarkRecorder(RECORD_LANDMARKS)
+    atexit.register(landmark_recorder.close)
+
+# Clips get their own worker so encoding never competes with frame inference
+clip_executor = InferenceExecutor(workers=1, queue_limit=2, use_gevent=(SERVER_MODE == 'production'))
+clip_buffers = {}
+congestion_controllers = {}
+countdown_scheduler = CountdownScheduler(socketio.start_background_task, socketio.sleep)
+
+# MediaPipe graphs are not thread-safe, so every inference worker gets its own detector
+_worker_local = local()
+
+def get_gesture_detector():
+    detector = getattr(_worker_local, 'gesture_detector', None)
+    if detector is None:
+        detector = GestureDetector()
+        try:
+            detector.hands.min_detection_confidence = 0.6
+            detector.hands.min_tracking_confidence = 0.5
+        except:
+            pass
+        _worker_local.gesture_detector = detector
+    return detector
 
 
 if not os.path.exists("sessions"):
     os.mkdir("sessions")
 
-SESSION_DIR = None
-current_state = {
-    'state': 'PROMPT_TIMER',
-    'timer_value': None,
-    'countdown_end': None,
-    'detected_gesture': None,
-    'last_count': None,
-    'count_streak': 0,
-    'thumb_up_streak': 0,
-    'fist_streak': 0,
-    'capture_count': 0,
-    'captured_images': [],
-    'strip_filename': None
-}
-state_lock = Lock()
-
-CONSECUTIVE_REQUIRED = 5
-PHOTOS_PER_STRIP = 4
+PHOTOS_PER_STRIP = slot_count(STRIP_LAYOUT)
+
+
+class BoothSession:
+    """One connected client's booth: state engine, session directory and captured photos.
+
+    lock guards the engine and photo list against the client's other events
+    and its countdown timer; never emit while holding it.
+    """
+
+    def __init__(self):
+        # Random 32-bit id, so landmark recordings appended across restarts keep booths apart
+        self.id = uuid.uuid4().int & 0xFFFFFFFF
+        # Suffixed with the id so booths connecting in the same second never share a directory.
+        # The directory itself is created on the first save, so reloads don't leave empty sessions behind
+        self.dir = f"sessions/{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}_{self.id:08x}"
+        self.booth = booth_state.BoothEngine(photos_per_strip=PHOTOS_PER_STRIP)
+        self.captured_images = []
+        self.strip_filename = None
+        self.lock = Lock()
+
+
+booth_sessions = {}
+
+retention_manager = RetentionManager(
+    root='sessions',
+    archive_after=ARCHIVE_AFTER_HOURS * 3600,
+    quota_bytes=SESSIONS_QUOTA_MB * 1024 * 1024,
+    active_fn=lambda: [session.dir for session in list(booth_sessions.values())]
+)
+retention_executor = InferenceExecutor(workers=1, queue_limit=1, use_gevent=(SERVER_MODE == 'production'))
 
 
 @app.route('/')
@@ -84,310 +156,383 @@ def about():
 def serve_photo(filename):
     return send_from_directory('sessions', filename)
 
+@app.route('/stats/countdown')
+def countdown_stats():
+    return jsonify(countdown_scheduler.stats())
+
+
+def get_booth_session(sid):
+    session = booth_sessions.get(sid)
+    if session is None:
+        session = booth_sessions[sid] = BoothSession()
+    return session
+
 
 @socketio.on('connect')
 def handle_connect():
-    global SESSION_DIR
-    SESSION_DIR = f"sessions/{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
-    os.makedirs(SESSION_DIR, exist_ok=True)
-    print(f"Client connected. Session: {SESSION_DIR}")
-    emit('connected', {'session': SESSION_DIR})
+    session = booth_sessions[request.sid] = BoothSession()
+    if CLIP_FORMAT != 'off':
+        clip_buffers[request.sid] = FrameRingBuffer(max_bytes=CLIP_MAX_BYTES)
+    congestion_controllers[request.sid] = CongestionController()
+    print(f"Client connected. Session: {session.dir}")
+    emit('connected', {'session': session.dir})
 
 @socketio.on('disconnect')
 def handle_disconnect():
+    booth_sessions.pop(request.sid, None)
+    clip_buffers.pop(request.sid, None)
+    congestion_controllers.pop(request.sid, None)
+    countdown_scheduler.forget(request.sid)
     print("Client disconnected")
 
 @socketio.on('video_frame')
 def handle_video_frame(data):
-    global current_state
+    received = time.perf_counter()
+    session = get_booth_session(request.sid)
+    congestion = congestion_controllers.get(request.sid)
 
     try:
+        try:
+            result = inference_executor.try_run(process_frame, data['image'])
+        except ExecutorBusy:
+            if congestion:
+                congestion.observe(0, 0, dropped=True)
+            payload = get_default_state(session, data['image'])
+            payload['dropped'] = True
+            emit_state_update(payload, congestion)
+            return
 
-        img_str = data['image'].split(',')[1]
-        img_data = base64.b64decode(img_str)
-        nparr = np.frombuffer(img_data, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
-        if frame is None or frame.size == 0:
-            emit('state_update', get_default_state(data['image']))
+        if result is None:
+            emit_state_update(get_default_state(session, data['image']), congestion)
             return
 
-        try:
-            frame, gesture_name = gesture_detector.detect_gesture(frame)
-        except Exception as gesture_error:
-            print(f"Gesture detection error: {gesture_error}")
-            gesture_name = None
-
-        with state_lock:
-            current_state['detected_gesture'] = gesture_name
-            process_state_machine(gesture_name)
-
-            encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), 70]
-            success, buffer = cv2.imencode('.jpg', frame, encode_param)
-            if not success:
-                return
-
-            frame_base64 = base64.b64encode(buffer).decode('utf-8')
-
-            emit('state_update', {
-                'frame': f'data:image/jpeg;base64,{frame_base64}',
-                'state': current_state['state'],
-                'timer_value': current_state['timer_value'],
-                'gesture': gesture_name,
-                'countdown': get_countdown(),
-                'streak_progress': get_streak_progress(),
-                'trigger_capture': (current_state['state'] == 'CAPTURE_DONE'),
-                'capture_count': current_state['capture_count'],
-                'total_captures': PHOTOS_PER_STRIP,
-                'strip_ready': current_state['capture_count'] >= PHOTOS_PER_STRIP,
-                'strip_filename': current_state['strip_filename']
-            })
+        frame_base64, gesture_name, hand, started = result
+        if congestion:
+            congestion.observe(time.perf_counter() - started, started - received)
+
+        with session.lock:
+            apply_gesture(session, gesture_name, hand, data['image'])
+            payload = build_state_update(session, gesture_name, f'data:image/jpeg;base64,{frame_base64}')
+        emit_state_update(payload, congestion)
 
     except Exception as e:
         print(f"Error processing frame: {e}")
-        emit('state_update', get_default_state(data.get('image', '')))
+        emit_state_update(get_default_state(session, data.get('image', '')), congestion)
+
+def emit_state_update(payload, congestion=None):
+    if congestion:
+        payload['recommended'] = congestion.recommendation()
+    emit('state_update', payload)
+
+@socketio.on('hand_landmarks')
+def handle_hand_landmarks(data):
+    """Landmark-only input from clients that track hands locally: no decode or inference, no frame in the reply"""
+    session = get_booth_session(request.sid)
+    try:
+        hand = parse_hand(data)
+        gesture_name = classify_landmarks(hand[0]) if hand else None
+
+        with session.lock:
+            apply_gesture(session, gesture_name, hand)
+            payload = build_state_update(session, gesture_name)
+        emit('state_update', payload)
+
+    except Exception as e:
+        print(f"Error processing landmarks: {e}")
+        emit('state_update', get_default_state(session, None))
+
+def parse_hand(data):
+    """Validate a hand_landmarks payload, returns (21 (x, y, z) points, handedness, score) or None if no hand.
+
+    Expected payload: {'landmarks': 21 {x, y, z} dicts, 21 [x, y, z] lists or 63 flat numbers,
+    'handedness': 'Left' / 'Right' or a MediaPipe category (list), 'score': 0..1}. Handedness is
+    reduced to 'Left', 'Right' or None; score defaults to the category's score, then 1.0.
+    """
+    landmarks = data.get('landmarks')
+    if not landmarks:
+        return None
+
+    if isinstance(landmarks[0], dict):
+        points = [(float(lm['x']), float(lm['y']), float(lm.get('z', 0.0))) for lm in landmarks]
+    elif isinstance(landmarks[0], (list, tuple)):
+        points = [(float(lm[0]), float(lm[1]), float(lm[2])) for lm in landmarks]
+    else:
+        flat = [float(v) for v in landmarks]
+        points = list(zip(flat[0::3], flat[1::3], flat[2::3])) if len(flat) == 63 else []
+
+    if len(points) != 21 or not all(math.isfinite(v) for point in points for v in point):
+        raise ValueError("expected 21 finite (x, y, z) landmarks")
+
+    handedness, category_score = parse_handedness(data.get('handedness'))
+    score = data.get('score', category_score)
+    score = 1.0 if score is None else float(score)
+    if not 0.0 <= score <= 1.0:
+        raise ValueError("expected a score between 0 and 1")
+
+    return points, handedness, score
+
+def parse_handedness(value):
+    """Reduce a handedness label or MediaPipe category ([{'categoryName': ..., 'score': ...}]) to ('Left' / 'Right' / None, score)"""
+    if isinstance(value, (list, tuple)):
+        value = value[0] if value else None
+    score = None
+    if isinstance(value, dict):
+        score = value.get('score')
+        value = value.get('categoryName') or value.get('label')
+    if value not in ('Left', 'Right'):
+        return None, None
+    return value, score
+
+def apply_gesture(session, gesture_name, hand, image=None):
+    """Record and feed one detection into the session's state machine; call with session.lock held"""
+    if landmark_recorder is not None:
+        landmark_recorder.append(hand, gesture_name, session=session.id)
+
+    booth = session.booth
+    previous_state = booth.state.state
+    booth.step(GESTURE_CODES.get(gesture_name, 0), time.time())
+    state = booth.state.state
+
+    if state == booth_state.COUNTDOWN:
+        if previous_state != booth_state.COUNTDOWN:
+            countdown_scheduler.schedule(request.sid, booth.state.countdown_end, fire_capture)
+        clip_buffer = clip_buffers.get(request.sid)
+        if clip_buffer is not None and image:
+            clip_buffer.append(image)
+    elif previous_state == booth_state.COUNTDOWN and state == booth_state.CAPTURE_DONE:
+        countdown_scheduler.cancel(request.sid)
+        countdown_finished(session, request.sid)
+
+def countdown_finished(session, sid):
+    """COUNTDOWN -> CAPTURE_DONE bookkeeping; call with session.lock held"""
+    clip_buffer = clip_buffers.get(sid)
+    if clip_buffer is not None and len(clip_buffer):
+        socketio.start_background_task(record_clip, clip_buffer.drain(), session.dir, sid)
+
+def fire_capture(sid, deadline, fired_at):
+    """Scheduler callback: end the countdown at its deadline even if no frame arrives; returns whether it fired"""
+    session = booth_sessions.get(sid)
+    if session is None:
+        return False
+
+    booth = session.booth
+    with session.lock:
+        if booth.state.state != booth_state.COUNTDOWN or booth.state.countdown_end != deadline:
+            return False
+
+        booth.end_countdown()
+        countdown_finished(session, sid)
+        capture_count = booth.state.capture_count
+
+    socketio.emit('trigger_capture', {
+        'countdown_end': deadline * 1000,
+        'fired_at': fired_at * 1000,
+        'jitter_ms': round((fired_at - deadline) * 1000, 3),
+        'capture_count': capture_count,
+        'total_captures': PHOTOS_PER_STRIP
+    }, to=sid)
+    return True
+
+@socketio.on('clock_sync')
+def handle_clock_sync(data):
+    """Ack with the server clock (ms) so the client can estimate its offset from the round trip"""
+    return {'t0': data.get('t0'), 'server_time': time.time() * 1000}
 
-def get_default_state(image):
+def build_state_update(session, gesture_name, frame=None):
+    booth = session.booth
+    return {
+        'frame': frame,
+        'state': booth.state_name,
+        'timer_value': booth.state.timer_value or None,
+        'gesture': gesture_name,
+        'countdown': get_countdown(booth),
+        'countdown_end': get_countdown_end(booth),
+        'streak_progress': booth.get_streak_progress(),
+        'trigger_capture': (booth.state.state == booth_state.CAPTURE_DONE),
+        'capture_count': booth.state.capture_count,
+        'total_captures': PHOTOS_PER_STRIP,
+        'strip_ready': booth.state.capture_count >= PHOTOS_PER_STRIP,
+        'strip_filename': session.strip_filename
+    }
+
+def process_frame(image):
+    """Decode, run inference on and re-encode one frame; runs on an inference worker"""
+    started = time.perf_counter()
+    img_str = image.split(',')[1]
+    img_data = base64.b64decode(img_str)
+    nparr = np.frombuffer(img_data, np.uint8)
+    frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+
+    if frame is None or frame.size == 0:
+        return None
+
+    detector = get_gesture_detector()
+    try:
+        frame, gesture_name = detector.detect_gesture(frame)
+        hand = detector.last_hand
+    except Exception as gesture_error:
+        print(f"Gesture detection error: {gesture_error}")
+        gesture_name, hand = None, None
+
+    encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), 70]
+    success, buffer = cv2.imencode('.jpg', frame, encode_param)
+    if not success:
+        return None
+
+    return base64.b64encode(buffer).decode('utf-8'), gesture_name, hand, started
+
+def record_clip(frames, session_dir, sid):
+    """Background task: encode the countdown frames on the clip worker and notify the client"""
+    try:
+        clip_filename = clip_executor.try_run(encode_clip, frames, session_dir, CLIP_FORMAT)
+    except ExecutorBusy:
+        print("Clip encoder busy, skipping clip")
+        return
+
+    if clip_filename:
+        socketio.emit('clip_ready', {'filename': clip_filename}, to=sid)
+
+def get_default_state(session, image):
+    booth = session.booth
     return {
         'frame': image,
-        'state': current_state['state'],
-        'timer_value': current_state['timer_value'],
+        'state': booth.state_name,
+        'timer_value': booth.state.timer_value or None,
         'gesture': None,
-        'countdown': get_countdown(),
-        'streak_progress': get_streak_progress(),
+        'countdown': get_countdown(booth),
+        'countdown_end': get_countdown_end(booth),
+        'streak_progress': booth.get_streak_progress(),
         'trigger_capture': False,
-        'capture_count': current_state['capture_count'],
+        'capture_count': booth.state.capture_count,
         'total_captures': PHOTOS_PER_STRIP
     }
 
 
-def process_state_machine(gesture_name):
-    global current_state
-
-    state = current_state['state']
-    current_time = time.time()
-
-    finger_count_map = {
-        "One Finger": 1,
-        "Peace Sign": 2,
-        "Three Fingers": 3,
-        "Four Fingers": 4,
-        "Open Palm": 5
-    }
+def reset_to_prompt(session):
+    session.booth.reset()
+    session.captured_images.clear()
+    session.strip_filename = None
 
-    detected_count = finger_count_map.get(gesture_name)
-    thumb_up = (gesture_name == "Thumbs Up")
-    fist_detected = (gesture_name == "Fist")
-
-    if state == 'PROMPT_TIMER':
-        if detected_count and 1 <= detected_count <= 5:
-            current_state.update({'state': 'DETECTING_FINGERS', 'last_count': detected_count, 'count_streak': 1})
-
-    elif state == 'DETECTING_FINGERS':
-        if detected_count:
-            if detected_count == current_state['last_count']:
-                current_state['count_streak'] += 1
-                if current_state['count_streak'] >= CONSECUTIVE_REQUIRED:
-                    current_state.update({'timer_value': detected_count, 'state': 'TIMER_SET', 'count_streak': 0})
-                    print(f"Timer set to: {detected_count}s")
-            else:
-                current_state.update({'count_streak': 1, 'last_count': detected_count})
-        else:
-            reset_to_prompt()
-
-    elif state == 'TIMER_SET':
-        current_state.update({'state': 'AWAIT_THUMBS_UP', 'thumb_up_streak': 0, 'fist_streak': 0})
-
-    elif state == 'AWAIT_THUMBS_UP':
-        if thumb_up:
-            current_state['thumb_up_streak'] += 1
-            if current_state['thumb_up_streak'] >= CONSECUTIVE_REQUIRED:
-                current_state.update({'countdown_end': current_time + current_state['timer_value'], 'state': 'COUNTDOWN'})
-                print(f"▶ Starting countdown: {current_state['timer_value']}s")
-        elif fist_detected:
-            current_state['fist_streak'] += 1
-            if current_state['fist_streak'] >= CONSECUTIVE_REQUIRED:
-                print("Resetting timer")
-                reset_to_prompt()
-        else:
-            current_state['thumb_up_streak'] = current_state['fist_streak'] = 0
-
-    elif state == 'COUNTDOWN':
-        if get_countdown() is not None and get_countdown() <= 0:
-            current_state.update({'state': 'CAPTURE_DONE', 'countdown_end': None})
-            print(f"Capture {current_state['capture_count'] + 1}/{PHOTOS_PER_STRIP}")
-
-def reset_to_prompt():
-    global current_state
-    current_state.update({
-        'state': 'PROMPT_TIMER',
-        'timer_value': None,
-        'countdown_end': None,
-        'detected_gesture': None,
-        'last_count': None,
-        'count_streak': 0,
-        'thumb_up_streak': 0,
-        'fist_streak': 0,
-        'capture_count': 0,
-        'captured_images': [],
-        'strip_filename': None
-    })
-
-def get_countdown():
-    if current_state['state'] == 'COUNTDOWN' and current_state['countdown_end']:
-        remaining = current_state['countdown_end'] - time.time()
-        return max(0, int(round(remaining)))
-    return None
+def get_countdown(booth):
+    return booth.get_countdown(time.time())
 
-def get_streak_progress():
-    if current_state['state'] == 'DETECTING_FINGERS':
-        return {'current': current_state['count_streak'], 'required': CONSECUTIVE_REQUIRED}
-    elif current_state['state'] == 'AWAIT_THUMBS_UP':
-        if current_state['thumb_up_streak'] > 0:
-            return {'current': current_state['thumb_up_streak'], 'required': CONSECUTIVE_REQUIRED}
-        elif current_state['fist_streak'] > 0:
-            return {'current': current_state['fist_streak'], 'required': CONSECUTIVE_REQUIRED}
+def get_countdown_end(booth):
+    """Countdown deadline in server epoch milliseconds, for the client's local countdown"""
+    if booth.state.state == booth_state.COUNTDOWN and booth.state.countdown_end:
+        return booth.state.countdown_end * 1000
     return None
 
 
 @socketio.on('save_photo')
 def handle_save_photo(data):
-    global SESSION_DIR
+    session = get_booth_session(request.sid)
+    booth = session.booth
 
     try:
-        if current_state['capture_count'] >= PHOTOS_PER_STRIP:
+        if booth.state.capture_count >= PHOTOS_PER_STRIP:
             return
 
-        if SESSION_DIR is None or not os.path.exists(SESSION_DIR):
-            SESSION_DIR = f"sessions/{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            os.makedirs(SESSION_DIR, exist_ok=True)
-
         img_data = data.get('image')
         if not img_data:
             emit('photo_error', {'error': 'No image data'})
             return
 
-        current_state['captured_images'].append(img_data)
-        current_state['capture_count'] += 1
+        with session.lock:
+            # Only a running or just-finished countdown takes a photo; stale uploads (e.g. after a reset) are refused
+            accepted = booth.state.state in (booth_state.COUNTDOWN, booth_state.CAPTURE_DONE)
+            if accepted:
+                # The client fires on its own clock and may upload just before the server timer does
+                if booth.end_countdown():
+                    countdown_scheduler.cancel(request.sid)
+                    countdown_finished(session, request.sid)
+
+                session.captured_images.append(img_data)
+                strip_complete = booth.capture_saved()
+                capture_count = booth.state.capture_count
+
+        if not accepted:
+            print(f"Ignoring photo uploaded in state {booth.state_name}")
+            emit('photo_error', {'error': 'No capture in progress'})
+            return
 
-        emit('photo_received', {'count': current_state['capture_count'], 'total': PHOTOS_PER_STRIP})
+        os.makedirs(session.dir, exist_ok=True)
+        emit('photo_received', {'count': capture_count, 'total': PHOTOS_PER_STRIP})
 
-        if current_state['capture_count'] >= PHOTOS_PER_STRIP:
-            current_state['state'] = 'STRIP_GENERATING'
-            strip_filename = create_photo_strip(current_state['captured_images'], SESSION_DIR)
-            if strip_filename:
-                current_state['strip_filename'] = strip_filename
-                emit('strip_ready', {'filename': strip_filename, 'message': 'Photo strip ready!'})
-            reset_to_prompt()
+        if strip_complete:
+            session.strip_filename = create_photo_strip(session.captured_images, session.dir)
+            if session.strip_filename:
+                emit('strip_ready', {'filename': session.strip_filename, 'message': 'Photo strip ready!'})
+            with session.lock:
+                reset_to_prompt(session)
         else:
             time.sleep(1)
-            current_state.update({
-                'countdown_end': time.time() + current_state['timer_value'],
-                'state': 'COUNTDOWN'
-            })
+            with session.lock:
+                if booth.state.state == booth_state.CAPTURE_DONE and booth.state.timer_value:
+                    booth.start_countdown(time.time())
+                    countdown_scheduler.schedule(request.sid, booth.state.countdown_end, fire_capture)
 
     except Exception as e:
         print(f"Error saving photo: {e}")
-        reset_to_prompt()
+        with session.lock:
+            reset_to_prompt(session)
         emit('photo_error', {'error': str(e)})
 
 
 
 def create_photo_strip(images, session_dir):
     try:
-       
-        DPI = 300
-        STRIP_WIDTH_MM = 51
-        STRIP_HEIGHT_MM = 152
-        
-    
-        MM_TO_INCH = 0.0393701
-        STRIP_WIDTH_PX = int(STRIP_WIDTH_MM * MM_TO_INCH * DPI)  # ~602px
-        STRIP_HEIGHT_PX = int(STRIP_HEIGHT_MM * MM_TO_INCH * DPI)  # ~1795px
-        
- 
-        TOP_BORDER = 60
-        SIDE_BORDER = 60
-        PHOTO_SPACING = 40
-        BOTTOM_AREA = 100  
-        
-        available_height = STRIP_HEIGHT_PX - TOP_BORDER - BOTTOM_AREA - (PHOTO_SPACING * (PHOTOS_PER_STRIP - 1))
-        PHOTO_HEIGHT = available_height // PHOTOS_PER_STRIP
-        PHOTO_WIDTH = STRIP_WIDTH_PX - (SIDE_BORDER * 2)
-        
-        print(f"Strip size: {STRIP_WIDTH_PX}x{STRIP_HEIGHT_PX}px ({STRIP_WIDTH_MM}x{STRIP_HEIGHT_MM}mm)")
-        print(f"Photo slots: {PHOTO_WIDTH}x{PHOTO_HEIGHT}px")
-        
-        FRAME_COLOR = (255, 255, 255)
-        strip = Image.new('RGB', (STRIP_WIDTH_PX, STRIP_HEIGHT_PX), FRAME_COLOR)
-
-        for i, img_data in enumerate(images):
-            img_bytes = base64.b64decode(img_data.split(',')[1])
-            photo = Image.open(io.BytesIO(img_bytes))
-            
-    
-            target_aspect = PHOTO_WIDTH / PHOTO_HEIGHT
-            photo_aspect = photo.width / photo.height
-
-            if photo_aspect > target_aspect:
-            
-                new_width = int(photo.height * target_aspect)
-                left = (photo.width - new_width) // 2
-                photo = photo.crop((left, 0, left + new_width, photo.height))
-            else:
-          
-                new_height = int(photo.width / target_aspect)
-                top = (photo.height - new_height) // 2
-                photo = photo.crop((0, top, photo.width, top + new_height))
-            
-            photo = photo.resize((PHOTO_WIDTH, PHOTO_HEIGHT), Image.Resampling.LANCZOS)
-
-            y_pos = TOP_BORDER + i * (PHOTO_HEIGHT + PHOTO_SPACING)
-            strip.paste(photo, (SIDE_BORDER, y_pos))
-        
-        draw = ImageDraw.Draw(strip)
+        layout = get_layout(STRIP_LAYOUT)
+        DPI = layout['dpi']
+        (STRIP_WIDTH_PX, STRIP_HEIGHT_PX), slots = layout_geometry(STRIP_LAYOUT)
 
-        now = datetime.datetime.now()
-        branding_text = f"VisionBooth {now.strftime('%m/%d/%y')}"
+        print(f"Strip size: {STRIP_WIDTH_PX}x{STRIP_HEIGHT_PX}px ({layout['width_mm']}x{layout['height_mm']}mm) | Layout: {STRIP_LAYOUT}")
+        print(f"Photo slots: {slots[0][2]}x{slots[0][3]}px")
 
-        try:
-            font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 36)
-        except:
-            try:
-                font = ImageFont.truetype("arial.ttf", 36)
-            except:
-                font = ImageFont.load_default()
-
-        bbox = draw.textbbox((0, 0), branding_text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-        
-        text_x = (STRIP_WIDTH_PX - text_width) // 2
-        text_y = STRIP_HEIGHT_PX - BOTTOM_AREA + (BOTTOM_AREA - text_height) // 2
-
-        shadow_offset = 2
-        draw.text((text_x + shadow_offset, text_y + shadow_offset), branding_text, fill=(200, 200, 200), font=font)
-        draw.text((text_x, text_y), branding_text, fill=(50, 50, 50), font=font)
+        # Slot crop/resize and the PNG encode run on the inference workers
+        strip = compose_strip(images, STRIP_LAYOUT, map_fn=inference_executor.map)
 
+        now = datetime.datetime.now()
         filename = f"strip_{now.strftime('%Y%m%d_%H%M%S')}.png"
         path = os.path.join(session_dir, filename)
-        strip.save(path, dpi=(DPI, DPI), quality=95, optimize=False)
-        
+        inference_executor.run(save_strip, strip, path, DPI)
+
         print(f"Strip saved: {path}")
-        print(f"   Size: {STRIP_WIDTH_PX}x{STRIP_HEIGHT_PX}px | {STRIP_WIDTH_MM}x{STRIP_HEIGHT_MM}mm @ {DPI}DPI")
-        
+        print(f"   Size: {STRIP_WIDTH_PX}x{STRIP_HEIGHT_PX}px | {layout['width_mm']}x{layout['height_mm']}mm @ {DPI}DPI")
+
         return f"{session_dir}/{filename}" if os.path.exists(path) else None
-        
+
     except Exception as e:
         print(f"❌ Error creating strip: {e}")
         import traceback
         traceback.print_exc()
         return None
 
+def save_strip(strip, path, dpi):
+    strip.save(path, dpi=(dpi, dpi), quality=95, optimize=False)
+
+
+def retention_loop():
+    """Background task: run one incremental retention step per interval on its own worker"""
+    while True:
+        socketio.sleep(RETENTION_INTERVAL)
+        try:
+            stats = retention_executor.try_run(retention_manager.step)
+            if stats['removed'] or stats['archived'] or stats['evicted']:
+                print(f"Retention: removed {stats['removed']}, archived {stats['archived']}, evicted {stats['evicted']}")
+        except ExecutorBusy:
+            pass
+        except Exception as e:
+            print(f"Retention error: {e}")
+
 
 if __name__ == '__main__':
     print("=" * 50)
     print("VisionBooth Starting...")
-    print("Open browser at: http://localhost:5000")
+    print(f"Open browser at: http://localhost:{PORT}")
+    print(f"Mode: {SERVER_MODE} | Inference workers: {INFERENCE_WORKERS} | Queue limit: {INFERENCE_QUEUE_LIMIT}")
     print("=" * 50)
-    socketio.run(app, debug=False, host='0.0.0.0', port=5000, allow_unsafe_werkzeug=True)
+    socketio.start_background_task(retention_loop)
+    if SERVER_MODE == 'production':
+        socketio.run(app, debug=False, host=HOST, port=PORT)
+    else:
+        socketio.run(app, debug=False, host=HOST, port=PORT, allow_unsafe_werkzeug=True)
@@ -0,0 +1,61 @@
+import argparse
+import base64
+import time
+
+import cv2
+import numpy as np
+
+from strip_layout import LAYOUTS, compose_strip, layout_geometry, render_background, slot_count
+
+
+def synthetic_capture(width, height, seed):
+    """A noisy gradient PNG data URL, roughly as hard to encode/decode as a webcam capture"""
+    rng = np.random.default_rng(seed)
+    gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+    img = np.clip(gradient + rng.normal(0, 25, (height, width, 3)), 0, 255).astype(np.uint8)
+    success, buffer = cv2.imencode('.png', img)
+    return 'data:image/png;base64,' + base64.b64encode(buffer).decode('utf-8')
+
+
+def time_call(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark photo strip compositing time per layout")
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    max_slots = max(slot_count(name) for name in LAYOUTS)
+    print(f"Encoding {max_slots} synthetic {args.width}x{args.height} captures...")
+    images = [synthetic_capture(args.width, args.height, i) for i in range(max_slots)]
+
+    header = f"{'layout':<12} {'size':>11} {'slots':>5} {'cold ms':>8} {'serial ms':>10} {'parallel ms':>12} {'p90 ms':>8}"
+    print("=" * len(header))
+    print(header)
+    print("-" * len(header))
+
+    for name in LAYOUTS:
+        (width, height), _ = layout_geometry(name)
+        photos = images[:slot_count(name)]
+
+        render_background.cache_clear()
+        cold = time_call(lambda: compose_strip(photos, name), 1)[0]
+        serial = time_call(lambda: compose_strip(photos, name, map_fn=lambda fn, items: list(map(fn, items))), args.repeat)
+        parallel = time_call(lambda: compose_strip(photos, name), args.repeat)
+
+        print(f"{name:<12} {f'{width}x{height}':>11} {len(photos):>5} {cold:>8.1f} {np.median(serial):>10.1f} "
+              f"{np.median(parallel):>12.1f} {np.percentile(parallel, 90):>8.1f}")
+
+    print("=" * len(header))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import time
+
+import numpy as np
+
+import booth_state
+from gestures import GESTURES
+
+
+def synthetic_events(count, seed=0, mean_run=6):
+    """Gesture codes in runs of repeated gestures, like a person holding a pose in front of the camera"""
+    rng = np.random.default_rng(seed)
+    runs = rng.geometric(1 / mean_run, size=count // mean_run + 1)
+    codes = np.repeat(rng.integers(0, len(GESTURES), size=len(runs)), runs)[:count]
+    return codes.astype(np.int8)
+
+
+def run_engine(codes, timestamps, photos_per_strip):
+    engine = booth_state.BoothEngine(photos_per_strip=photos_per_strip, log=None)
+    state = engine.state
+    step = engine.step
+    capture_done = booth_state.CAPTURE_DONE
+    captures = 0
+
+    for code, now in zip(codes, timestamps):
+        step(code, now)
+        if state.state == capture_done:
+            captures += 1
+            if engine.capture_saved():
+                engine.reset()
+            else:
+                engine.start_countdown(now)
+
+    return captures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the table-driven booth state engine")
+    parser.add_argument('--events', type=int, default=2_000_000)
+    parser.add_argument('--fps', type=float, default=5.0)
+    parser.add_argument('--photos', type=int, default=4)
+    parser.add_argument('--recording', help="Use the gestures from a landmark recording instead of synthetic ones")
+    args = parser.parse_args()
+
+    if args.recording:
+        from landmark_recorder import load_recording
+        records = load_recording(args.recording)
+        codes = np.asarray(records['gesture']).tolist()
+        timestamps = np.asarray(records['timestamp']).tolist()
+    else:
+        codes = synthetic_events(args.events).tolist()
+        timestamps = (np.arange(len(codes)) / args.fps).tolist()
+
+    # Warm up, then time the step loop only (inputs are already plain Python ints and floats)
+    run_engine(codes[:10_000], timestamps[:10_000], args.photos)
+    start = time.perf_counter()
+    captures = run_engine(codes, timestamps, args.photos)
+    elapsed = time.perf_counter() - start
+
+    print(f"Events:   {len(codes):,}")
+    print(f"Captures: {captures:,}")
+    print(f"Elapsed:  {elapsed:.2f}s ({len(codes) / elapsed:,.0f} events/s, {elapsed / len(codes) * 1e9:.0f} ns/event)")
+
+
+if __name__ == '__main__':
+    main()
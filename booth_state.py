@@ -0,0 +1,217 @@
+import time
+
+from gestures import GESTURES
+
+
+CONSECUTIVE_REQUIRED = 5
+
+STATE_NAMES = (
+    'PROMPT_TIMER',
+    'DETECTING_FINGERS',
+    'TIMER_SET',
+    'AWAIT_THUMBS_UP',
+    'COUNTDOWN',
+    'CAPTURE_DONE',
+    'STRIP_GENERATING',
+)
+(PROMPT_TIMER, DETECTING_FINGERS, TIMER_SET, AWAIT_THUMBS_UP,
+ COUNTDOWN, CAPTURE_DONE, STRIP_GENERATING) = range(len(STATE_NAMES))
+
+FINGER_COUNT_MAP = {
+    "One Finger": 1,
+    "Peace Sign": 2,
+    "Three Fingers": 3,
+    "Four Fingers": 4,
+    "Open Palm": 5
+}
+
+# Input classes the transition table is indexed by, precomputed per gesture code
+OTHER, COUNT, THUMB_UP, FIST = range(4)
+FINGER_COUNTS = tuple(FINGER_COUNT_MAP.get(name, 0) for name in GESTURES)
+INPUT_CLASSES = tuple(
+    COUNT if FINGER_COUNT_MAP.get(name) else
+    THUMB_UP if name == "Thumbs Up" else
+    FIST if name == "Fist" else
+    OTHER
+    for name in GESTURES
+)
+
+
+class BoothState:
+    """Compact mutable booth state; 0 means unset for timer_value and countdown_end"""
+
+    __slots__ = ('state', 'timer_value', 'countdown_end', 'last_count',
+                 'count_streak', 'thumb_up_streak', 'fist_streak', 'capture_count')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.state = PROMPT_TIMER
+        self.timer_value = 0
+        self.countdown_end = 0.0
+        self.last_count = 0
+        self.count_streak = 0
+        self.thumb_up_streak = 0
+        self.fist_streak = 0
+        self.capture_count = 0
+
+
+# === ACTIONS: fn(engine, gesture_code, now) ===
+
+def _ignore(engine, code, now):
+    pass
+
+
+def _reset(engine, code, now):
+    engine.state.reset()
+
+
+def _start_detecting(engine, code, now):
+    s = engine.state
+    s.state = DETECTING_FINGERS
+    s.last_count = FINGER_COUNTS[code]
+    s.count_streak = 1
+
+
+def _count(engine, code, now):
+    s = engine.state
+    count = FINGER_COUNTS[code]
+    if count != s.last_count:
+        s.count_streak = 1
+        s.last_count = count
+        return
+
+    s.count_streak += 1
+    if s.count_streak >= engine.consecutive_required:
+        s.timer_value = count
+        s.state = TIMER_SET
+        s.count_streak = 0
+        if engine.log:
+            engine.log(f"Timer set to: {count}s")
+
+
+def _await_thumbs_up(engine, code, now):
+    s = engine.state
+    s.state = AWAIT_THUMBS_UP
+    s.thumb_up_streak = 0
+    s.fist_streak = 0
+
+
+def _thumb_up(engine, code, now):
+    s = engine.state
+    s.thumb_up_streak += 1
+    s.fist_streak = 0
+    if s.thumb_up_streak >= engine.consecutive_required:
+        engine.start_countdown(now)
+        if engine.log:
+            engine.log(f"▶ Starting countdown: {s.timer_value}s")
+
+
+def _fist(engine, code, now):
+    s = engine.state
+    s.fist_streak += 1
+    s.thumb_up_streak = 0
+    if s.fist_streak >= engine.consecutive_required:
+        if engine.log:
+            engine.log("Resetting timer")
+        s.reset()
+
+
+def _clear_streaks(engine, code, now):
+    s = engine.state
+    s.thumb_up_streak = 0
+    s.fist_streak = 0
+
+
+def _countdown(engine, code, now):
+    if now >= engine.state.countdown_end:
+        engine.end_countdown()
+
+
+# TRANSITIONS[state][input class] -> action
+TRANSITIONS = (
+    #  OTHER            COUNT              THUMB_UP          FIST
+    (_ignore,          _start_detecting,  _ignore,          _ignore),           # PROMPT_TIMER
+    (_reset,           _count,            _reset,           _reset),            # DETECTING_FINGERS
+    (_await_thumbs_up, _await_thumbs_up,  _await_thumbs_up, _await_thumbs_up),  # TIMER_SET
+    (_clear_streaks,   _clear_streaks,    _thumb_up,        _fist),             # AWAIT_THUMBS_UP
+    (_countdown,       _countdown,        _countdown,       _countdown),        # COUNTDOWN
+    (_ignore,          _ignore,           _ignore,          _ignore),           # CAPTURE_DONE
+    (_ignore,          _ignore,           _ignore,          _ignore),           # STRIP_GENERATING
+)
+
+
+class BoothEngine:
+    """Table-driven booth state machine shared by app.py and main.py.
+
+    step() feeds one gesture code (see gestures.GESTURES) at an explicit time
+    and allocates nothing outside of logged transitions. The capture side is
+    driven by the caller: end_countdown() when the deadline fires,
+    capture_saved() once a photo is stored, start_countdown() for the next
+    photo and reset() when the strip is done.
+    """
+
+    def __init__(self, clock=time.time, consecutive_required=CONSECUTIVE_REQUIRED, photos_per_strip=4, log=print):
+        self.clock = clock
+        self.consecutive_required = consecutive_required
+        self.photos_per_strip = photos_per_strip
+        self.log = log
+        self.state = BoothState()
+
+    @property
+    def state_name(self):
+        return STATE_NAMES[self.state.state]
+
+    def step(self, code, now):
+        TRANSITIONS[self.state.state][INPUT_CLASSES[code]](self, code, now)
+
+    def update(self, code):
+        """step() at the injected clock's current time"""
+        TRANSITIONS[self.state.state][INPUT_CLASSES[code]](self, code, self.clock())
+
+    def start_countdown(self, now):
+        s = self.state
+        s.countdown_end = now + s.timer_value
+        s.state = COUNTDOWN
+
+    def end_countdown(self):
+        """COUNTDOWN -> CAPTURE_DONE; returns False if no countdown was running"""
+        s = self.state
+        if s.state != COUNTDOWN:
+            return False
+        s.state = CAPTURE_DONE
+        s.countdown_end = 0.0
+        if self.log:
+            self.log(f"Capture {s.capture_count + 1}/{self.photos_per_strip}")
+        return True
+
+    def capture_saved(self):
+        """Count a stored photo; returns True (state STRIP_GENERATING) once the strip is complete"""
+        s = self.state
+        s.capture_count += 1
+        if s.capture_count >= self.photos_per_strip:
+            s.state = STRIP_GENERATING
+            return True
+        return False
+
+    def reset(self):
+        self.state.reset()
+
+    def get_countdown(self, now=None):
+        s = self.state
+        if s.state == COUNTDOWN and s.countdown_end:
+            remaining = s.countdown_end - (self.clock() if now is None else now)
+            return max(0, int(round(remaining)))
+        return None
+
+    def get_streak_progress(self):
+        s = self.state
+        if s.state == DETECTING_FINGERS:
+            return {'current': s.count_streak, 'required': self.consecutive_required}
+        elif s.state == AWAIT_THUMBS_UP:
+            if s.thumb_up_streak > 0:
+                return {'current': s.thumb_up_streak, 'required': self.consecutive_required}
+            elif s.fist_streak > 0:
+                return {'current': s.fist_streak, 'required': self.consecutive_required}
+        return None
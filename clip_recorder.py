@@ -0,0 +1,109 @@
+import base64
+import os
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+from PIL import Image
+
+
+class FrameRingBuffer:
+    """Keeps the most recent encoded frames of one booth under a fixed byte cap.
+
+    Frames are stored as the JPEG data URLs the client sent, so appending is
+    just a reference and never decodes. The oldest frames are evicted first,
+    which bounds memory whatever the frame rate.
+    """
+
+    def __init__(self, max_bytes=8 * 1024 * 1024, max_frames=60):
+        self.max_bytes = max_bytes
+        self.max_frames = max_frames
+        self._frames = deque()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._frames)
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def append(self, frame, timestamp=None):
+        size = len(frame)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            self._frames.append((time.time() if timestamp is None else timestamp, frame))
+            self._bytes += size
+            while self._frames and (self._bytes > self.max_bytes or len(self._frames) > self.max_frames):
+                _, old = self._frames.popleft()
+                self._bytes -= len(old)
+
+    def drain(self):
+        """Return all buffered (timestamp, frame) pairs and empty the buffer"""
+        with self._lock:
+            frames = list(self._frames)
+            self._frames.clear()
+            self._bytes = 0
+        return frames
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self._bytes = 0
+
+
+def decode_frame(frame):
+    img_bytes = base64.b64decode(frame.split(',')[1])
+    return cv2.imdecode(np.frombuffer(img_bytes, np.uint8), cv2.IMREAD_COLOR)
+
+
+def encode_clip(frames, session_dir, fmt='gif', boomerang=True, max_width=480):
+    """Encode buffered (timestamp, frame) pairs into an animated GIF or MP4, returns the path"""
+    try:
+        images = []
+        for _, frame in frames:
+            img = decode_frame(frame)
+            if img is None or img.size == 0:
+                continue
+            if img.shape[1] > max_width:
+                scale = max_width / img.shape[1]
+                img = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            if images and img.shape != images[0].shape:
+                img = cv2.resize(img, (images[0].shape[1], images[0].shape[0]), interpolation=cv2.INTER_AREA)
+            images.append(img)
+
+        if len(images) < 2:
+            return None
+
+        span = frames[-1][0] - frames[0][0]
+        fps = min(30.0, max(2.0, (len(frames) - 1) / span)) if span > 0 else 5.0
+
+        if boomerang:
+            images = images + images[-2:0:-1]
+
+        os.makedirs(session_dir, exist_ok=True)
+        filename = f"clip_{time.strftime('%Y%m%d_%H%M%S')}_{int(time.time() * 1000) % 1000:03d}.{fmt}"
+        path = os.path.join(session_dir, filename)
+
+        if fmt == 'mp4':
+            height, width = images[0].shape[:2]
+            writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+            for img in images:
+                writer.write(img)
+            writer.release()
+        else:
+            pil_frames = [Image.fromarray(cv2.cvtColor(img, cv2.COLOR_BGR2RGB)) for img in images]
+            pil_frames[0].save(path, save_all=True, append_images=pil_frames[1:],
+                               duration=int(1000 / fps), loop=0, optimize=False)
+
+        print(f"Clip saved: {path} ({len(images)} frames @ {fps:.1f}fps)")
+        return f"{session_dir}/{filename}" if os.path.exists(path) else None
+
+    except Exception as e:
+        print(f"❌ Error encoding clip: {e}")
+        return None
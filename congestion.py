@@ -0,0 +1,77 @@
+# Quality ladder from best to most degraded: (frame scale, JPEG quality, frame interval ms).
+# The last rung is the floor below which hand detection starts missing gestures.
+LADDER = (
+    (0.50, 0.70, 150),
+    (0.42, 0.60, 175),
+    (0.35, 0.50, 200),
+    (0.30, 0.45, 250),
+    (0.25, 0.40, 333),
+    (0.25, 0.35, 500),
+)
+DEFAULT_LEVEL = 2  # what index.html used to hard-code
+
+# Fraction of the frame interval the server may spend on one frame before we step down
+TARGET_UTILIZATION = 0.5
+HEADROOM_RATIO = 0.4
+HEADROOM_FRAMES = 20
+HOLD_FRAMES = 5
+
+
+class CongestionController:
+    """Per-client recommendation of frame scale, JPEG quality and send interval.
+
+    Keeps an exponentially weighted average of server time per frame
+    (queue delay + processing). Steps one rung down the ladder as soon as that
+    exceeds its share of the frame interval, or when a frame is dropped. Steps
+    back up only after HEADROOM_FRAMES consecutive frames well under budget.
+    After every change it holds for HOLD_FRAMES frames so the client can adapt
+    before the next change.
+    """
+
+    def __init__(self, level=DEFAULT_LEVEL, alpha=0.2):
+        self.level = level
+        self.alpha = alpha
+        self.processing = None
+        self.queue_delay = None
+        self._headroom = 0
+        self._hold = 0
+
+    def _ewma(self, average, value):
+        return value if average is None else average + self.alpha * (value - average)
+
+    def observe(self, processing, queue_delay, dropped=False):
+        """Record one frame; times are in seconds"""
+        if not dropped:
+            self.processing = self._ewma(self.processing, processing)
+            self.queue_delay = self._ewma(self.queue_delay, queue_delay)
+
+        if self._hold > 0:
+            self._hold -= 1
+            return
+
+        budget = LADDER[self.level][2] / 1000 * TARGET_UTILIZATION
+        load = (self.processing or 0) + (self.queue_delay or 0)
+
+        if dropped or load > budget:
+            self._headroom = 0
+            if self.level < len(LADDER) - 1:
+                self.level += 1
+                self._hold = HOLD_FRAMES
+        elif load < budget * HEADROOM_RATIO:
+            self._headroom += 1
+            if self._headroom >= HEADROOM_FRAMES and self.level > 0:
+                self.level -= 1
+                self._headroom = 0
+                self._hold = HOLD_FRAMES
+        else:
+            self._headroom = 0
+
+    def recommendation(self):
+        scale, quality, interval = LADDER[self.level]
+        return {
+            'scale': scale,
+            'quality': quality,
+            'interval': interval,
+            'processing_ms': round((self.processing or 0) * 1000, 1),
+            'queue_ms': round((self.queue_delay or 0) * 1000, 1),
+        }
@@ -0,0 +1,65 @@
+import time
+from collections import deque
+
+
+class CountdownScheduler:
+    """Fires a callback at a per-session deadline, independent of frame arrival.
+
+    Each schedule() starts a background task (via the Socket.IO start_task/sleep
+    so it works under threading and gevent). The task sleeps coarsely until just
+    before the deadline, then in short steps. Scheduling again for the same key
+    supersedes the previous timer. The lateness of every fire whose callback
+    returns True is kept for jitter statistics.
+    """
+
+    def __init__(self, start_task, sleep, clock=time.time, spin=0.001, history=1000):
+        self.start_task = start_task
+        self.sleep = sleep
+        self.clock = clock
+        self.spin = spin
+        self._generations = {}
+        self._jitter = deque(maxlen=history)
+
+    def schedule(self, key, deadline, callback):
+        """Call callback(key, deadline, fired_at) at deadline (seconds on self.clock); it returns whether it fired"""
+        generation = self._generations.get(key, 0) + 1
+        self._generations[key] = generation
+        self.start_task(self._run, key, generation, deadline, callback)
+
+    def cancel(self, key):
+        if key in self._generations:
+            self._generations[key] += 1
+
+    def forget(self, key):
+        """Cancel and drop a session's timer state, e.g. on disconnect"""
+        self._generations.pop(key, None)
+
+    def _run(self, key, generation, deadline, callback):
+        while self._generations.get(key) == generation:
+            remaining = deadline - self.clock()
+            if remaining <= 0:
+                break
+            self.sleep(remaining - 0.01 if remaining > 0.02 else self.spin)
+
+        if self._generations.get(key) != generation:
+            return
+
+        fired_at = self.clock()
+        try:
+            if callback(key, deadline, fired_at):
+                self._jitter.append(fired_at - deadline)
+        except Exception as e:
+            print(f"Countdown callback error: {e}")
+
+    def stats(self):
+        """Trigger lateness over the recent history, in milliseconds"""
+        if not self._jitter:
+            return {'count': 0}
+        jitter = sorted(j * 1000 for j in self._jitter)
+        return {
+            'count': len(jitter),
+            'mean_ms': round(sum(jitter) / len(jitter), 3),
+            'p50_ms': round(jitter[len(jitter) // 2], 3),
+            'p99_ms': round(jitter[min(len(jitter) - 1, int(len(jitter) * 0.99))], 3),
+            'max_ms': round(jitter[-1], 3),
+        }
@@ -2,6 +2,9 @@ import cv2
 import mediapipe as mp
 import math
 import time
+import numpy as np
+from gesture_rules import analyze_landmarks
+
 
 class GestureDetector:
     def __init__(self):
@@ -15,6 +18,8 @@ class GestureDetector:
 
         self.last_timestamp = 0
         self.frame_counter = 0
+        # (21 (x, y, z) points, handedness label, score) of the last detected hand, or None
+        self.last_hand = None
 
     def distance(self, p1, p2):
         """Calculate Euclidean distance between two points"""
@@ -33,6 +38,7 @@ class GestureDetector:
             return frame, None
 
         gesture_name = None
+        self.last_hand = None
         try:
             results = self.hands.process(frame_rgb)
         except Exception as e:
@@ -45,122 +51,25 @@ class GestureDetector:
 
         if results.multi_hand_landmarks:
             hand_landmarks = results.multi_hand_landmarks[0]
-            landmarks = hand_landmarks.landmark
-            handedness = results.multi_handedness[0].classification[0].label
-            
-   
-            wrist = landmarks[0]
-            
-     
-            thumb_tip = landmarks[4]
-            thumb_ip = landmarks[3]
-            thumb_mcp = landmarks[2]
-            thumb_cmc = landmarks[1]
-            
-        
-            index_tip = landmarks[8]
-            index_pip = landmarks[6]
-            index_mcp = landmarks[5]
-            
-            middle_tip = landmarks[12]
-            middle_pip = landmarks[10]
-            middle_mcp = landmarks[9]
-            
-            ring_tip = landmarks[16]
-            ring_pip = landmarks[14]
-            ring_mcp = landmarks[13]
-            
-            pinky_tip = landmarks[20]
-            pinky_pip = landmarks[18]
-            pinky_mcp = landmarks[17]
-            
-            hand_size = self.distance(wrist, middle_mcp)
-
-            index_dist = self.distance(index_tip, index_mcp)
-            middle_dist = self.distance(middle_tip, middle_mcp)
-            ring_dist = self.distance(ring_tip, ring_mcp)
-            pinky_dist = self.distance(pinky_tip, pinky_mcp)
-            thumb_dist = self.distance(thumb_tip, thumb_cmc)
-            
-            index_ratio = index_dist / hand_size if hand_size > 0 else 0
-            middle_ratio = middle_dist / hand_size if hand_size > 0 else 0
-            ring_ratio = ring_dist / hand_size if hand_size > 0 else 0
-            pinky_ratio = pinky_dist / hand_size if hand_size > 0 else 0
-            thumb_ratio = thumb_dist / hand_size if hand_size > 0 else 0
-
-            FINGER_RATIO_THRESHOLD = 0.6
-            index_extended = (index_pip.y - index_tip.y) > 0.02 and index_ratio > FINGER_RATIO_THRESHOLD
-            middle_extended = (middle_pip.y - middle_tip.y) > 0.02 and middle_ratio > FINGER_RATIO_THRESHOLD
-            ring_extended = (ring_pip.y - ring_tip.y) > 0.02 and ring_ratio > FINGER_RATIO_THRESHOLD
-            pinky_extended = (pinky_pip.y - pinky_tip.y) > 0.02 and pinky_ratio > FINGER_RATIO_THRESHOLD
-
-            thumb_to_index_dist = self.distance(thumb_tip, index_mcp)
-            thumb_ratio_to_index = thumb_to_index_dist / hand_size if hand_size > 0 else 0
-            thumb_extended = thumb_ratio_to_index > 0.7 
-            
-
-            thumb_pointing_up = (thumb_mcp.y - thumb_tip.y) > 0.08
-            is_thumbs_up = (
-                thumb_extended and
-                thumb_pointing_up and
-                not index_extended and
-                not middle_extended and
-                not ring_extended and
-                not pinky_extended
-            )
-            
-
-            is_fist = (
-                not index_extended and
-                not middle_extended and
-                not ring_extended and
-                not pinky_extended and
-                thumb_ratio_to_index < 0.7  
-            )
-            
-            fingers_up = [index_extended, middle_extended, ring_extended, pinky_extended]
-            finger_count = sum(fingers_up)
-            
-            # === GESTURE PRIORITY ===
-            
-            # 1. FIST 
-            if is_fist:
-                gesture_name = "Fist"
-            
-            # 2. THUMBS UP 
-            elif is_thumbs_up:
-                gesture_name = "Thumbs Up"
-            
-            # 3. ONE FINGER - Only index extended
-            elif (index_extended and 
-                  not middle_extended and 
-                  not ring_extended and 
-                  not pinky_extended):
-                gesture_name = "One Finger"
-            
-            # 4. PEACE SIGN - Index and middle
-            elif (index_extended and 
-                  middle_extended and 
-                  not ring_extended and 
-                  not pinky_extended):
-                gesture_name = "Peace Sign"
-            
-            # 5. THREE FINGERS
-            elif (index_extended and 
-                  middle_extended and 
-                  ring_extended and 
-                  not pinky_extended):
-                gesture_name = "Three Fingers"
-            
-            # 6. FOUR FINGERS
-            elif finger_count == 4 and not thumb_extended:
-                gesture_name = "Four Fingers"
-            
-            # 7. OPEN PALM - All five 
-            elif finger_count == 4 and thumb_extended:
-                gesture_name = "Open Palm"
-            elif finger_count == 4 and thumb_ratio_to_index > 0.7:  
-                gesture_name = "Open Palm"
+            classification = results.multi_handedness[0].classification[0]
+            points = [(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark]
+
+            self.last_hand = (points, classification.label, classification.score)
+
+            metrics = analyze_landmarks(points)
+            gesture_name = metrics['gesture']
+            index_extended = metrics['index_extended']
+            middle_extended = metrics['middle_extended']
+            ring_extended = metrics['ring_extended']
+            pinky_extended = metrics['pinky_extended']
+            thumb_extended = metrics['thumb_extended']
+            thumb_pointing_up = metrics['thumb_pointing_up']
+            finger_count = metrics['finger_count']
+            index_ratio = metrics['index_ratio']
+            middle_ratio = metrics['middle_ratio']
+            ring_ratio = metrics['ring_ratio']
+            pinky_ratio = metrics['pinky_ratio']
+            thumb_ratio_to_index = metrics['thumb_ratio_to_index']
 
             # Draw hand landmarks
             mp.solutions.drawing_utils.draw_landmarks(
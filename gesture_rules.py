@@ -0,0 +1,138 @@
+import math
+
+import numpy as np
+
+
+# Gesture rules over raw (x, y, z) landmarks; no MediaPipe import, so recordings replay without it
+DEFAULT_THRESHOLDS = {
+    'finger_ratio': 0.6,          # FINGER_RATIO_THRESHOLD: tip-to-MCP distance / hand size
+    'finger_tip_offset': 0.02,    # tip must be this far above the PIP joint
+    'thumb_extended_ratio': 0.7,  # thumb tip to index MCP distance / hand size
+    'thumb_up_offset': 0.08,      # thumb tip must be this far above the thumb MCP
+}
+
+
+def _distance(p1, p2):
+    return math.sqrt((p1[0] - p2[0])**2 + (p1[1] - p2[1])**2 + (p1[2] - p2[2])**2)
+
+
+def analyze_landmarks(points, thresholds=DEFAULT_THRESHOLDS):
+    """Apply the gesture rules to 21 (x, y, z) hand landmarks, returns the gesture and the metrics behind it"""
+    finger_ratio = thresholds['finger_ratio']
+    tip_offset = thresholds['finger_tip_offset']
+    thumb_extended_ratio = thresholds['thumb_extended_ratio']
+
+    wrist = points[0]
+    thumb_tip, thumb_mcp = points[4], points[2]
+    index_tip, index_pip, index_mcp = points[8], points[6], points[5]
+    middle_tip, middle_pip, middle_mcp = points[12], points[10], points[9]
+    ring_tip, ring_pip, ring_mcp = points[16], points[14], points[13]
+    pinky_tip, pinky_pip, pinky_mcp = points[20], points[18], points[17]
+
+    hand_size = _distance(wrist, middle_mcp)
+
+    index_ratio = _distance(index_tip, index_mcp) / hand_size if hand_size > 0 else 0
+    middle_ratio = _distance(middle_tip, middle_mcp) / hand_size if hand_size > 0 else 0
+    ring_ratio = _distance(ring_tip, ring_mcp) / hand_size if hand_size > 0 else 0
+    pinky_ratio = _distance(pinky_tip, pinky_mcp) / hand_size if hand_size > 0 else 0
+
+    index_extended = (index_pip[1] - index_tip[1]) > tip_offset and index_ratio > finger_ratio
+    middle_extended = (middle_pip[1] - middle_tip[1]) > tip_offset and middle_ratio > finger_ratio
+    ring_extended = (ring_pip[1] - ring_tip[1]) > tip_offset and ring_ratio > finger_ratio
+    pinky_extended = (pinky_pip[1] - pinky_tip[1]) > tip_offset and pinky_ratio > finger_ratio
+
+    thumb_ratio_to_index = _distance(thumb_tip, index_mcp) / hand_size if hand_size > 0 else 0
+    thumb_extended = thumb_ratio_to_index > thumb_extended_ratio
+    thumb_pointing_up = (thumb_mcp[1] - thumb_tip[1]) > thresholds['thumb_up_offset']
+
+    no_fingers = not (index_extended or middle_extended or ring_extended or pinky_extended)
+    finger_count = index_extended + middle_extended + ring_extended + pinky_extended
+
+    # === GESTURE PRIORITY ===
+    gesture_name = None
+    if no_fingers and thumb_ratio_to_index < thumb_extended_ratio:
+        gesture_name = "Fist"
+    elif no_fingers and thumb_extended and thumb_pointing_up:
+        gesture_name = "Thumbs Up"
+    elif index_extended and not middle_extended and not ring_extended and not pinky_extended:
+        gesture_name = "One Finger"
+    elif index_extended and middle_extended and not ring_extended and not pinky_extended:
+        gesture_name = "Peace Sign"
+    elif index_extended and middle_extended and ring_extended and not pinky_extended:
+        gesture_name = "Three Fingers"
+    elif finger_count == 4 and not thumb_extended:
+        gesture_name = "Four Fingers"
+    elif finger_count == 4 and thumb_extended:
+        gesture_name = "Open Palm"
+
+    return {
+        'gesture': gesture_name,
+        'index_extended': index_extended,
+        'middle_extended': middle_extended,
+        'ring_extended': ring_extended,
+        'pinky_extended': pinky_extended,
+        'thumb_extended': thumb_extended,
+        'thumb_pointing_up': thumb_pointing_up,
+        'finger_count': finger_count,
+        'index_ratio': index_ratio,
+        'middle_ratio': middle_ratio,
+        'ring_ratio': ring_ratio,
+        'pinky_ratio': pinky_ratio,
+        'thumb_ratio_to_index': thumb_ratio_to_index,
+    }
+
+
+def classify_landmarks(points, thresholds=DEFAULT_THRESHOLDS):
+    """Gesture name for 21 (x, y, z) hand landmarks, or None"""
+    return analyze_landmarks(points, thresholds)['gesture']
+
+
+def classify_landmarks_batch(points, thresholds=DEFAULT_THRESHOLDS):
+    """Vectorized classify_landmarks over an (N, 21, 3) array, returns N gesture codes (see gestures.GESTURES).
+
+    Rows containing NaN (no hand) classify as code 0.
+    """
+    p = np.asarray(points, dtype=np.float64)
+    finger_ratio = thresholds['finger_ratio']
+    tip_offset = thresholds['finger_tip_offset']
+    thumb_extended_ratio = thresholds['thumb_extended_ratio']
+
+    def dist(a, b):
+        d = p[:, a] - p[:, b]
+        return np.sqrt(d[:, 0]**2 + d[:, 1]**2 + d[:, 2]**2)
+
+    hand_size = dist(0, 9)
+    valid_size = hand_size > 0
+    safe_size = np.where(valid_size, hand_size, 1.0)
+
+    def ratio(a, b):
+        return np.where(valid_size, dist(a, b) / safe_size, 0.0)
+
+    def extended(tip, pip, mcp):
+        return ((p[:, pip, 1] - p[:, tip, 1]) > tip_offset) & (ratio(tip, mcp) > finger_ratio)
+
+    index_extended = extended(8, 6, 5)
+    middle_extended = extended(12, 10, 9)
+    ring_extended = extended(16, 14, 13)
+    pinky_extended = extended(20, 18, 17)
+
+    thumb_ratio_to_index = ratio(4, 5)
+    thumb_extended = thumb_ratio_to_index > thumb_extended_ratio
+    thumb_pointing_up = (p[:, 2, 1] - p[:, 4, 1]) > thresholds['thumb_up_offset']
+
+    no_fingers = ~(index_extended | middle_extended | ring_extended | pinky_extended)
+    finger_count = (index_extended.astype(np.int8) + middle_extended + ring_extended + pinky_extended)
+    no_ring_pinky = ~ring_extended & ~pinky_extended
+
+    conditions = [
+        no_fingers & (thumb_ratio_to_index < thumb_extended_ratio),
+        no_fingers & thumb_extended & thumb_pointing_up,
+        index_extended & ~middle_extended & no_ring_pinky,
+        index_extended & middle_extended & no_ring_pinky,
+        index_extended & middle_extended & ring_extended & ~pinky_extended,
+        (finger_count == 4) & ~thumb_extended,
+        (finger_count == 4) & thumb_extended,
+    ]
+    codes = np.select(conditions, np.arange(1, len(conditions) + 1), 0).astype(np.int8)
+    codes[np.isnan(p).any(axis=(1, 2))] = 0
+    return codes
@@ -0,0 +1,3 @@
+# Gesture names by compact code (code 0 = no gesture), shared by the detector, recordings and the state engine
+GESTURES = (None, "Fist", "Thumbs Up", "One Finger", "Peace Sign", "Three Fingers", "Four Fingers", "Open Palm")
+GESTURE_CODES = {name: code for code, name in enumerate(GESTURES)}
@@ -0,0 +1,72 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ExecutorBusy(Exception):
+    """Raised by try_run when the executor already has queue_limit jobs in flight"""
+
+
+class InferenceExecutor:
+    """Bounded pool of real OS threads for CPU work (decode, inference, compositing).
+
+    In production mode the Socket.IO server runs on gevent, so jobs go to a
+    gevent ThreadPool and callers yield to the event loop while they wait.
+    In development mode a regular ThreadPoolExecutor is used. Calls must come
+    from request/event-loop context, never from inside a running job.
+    """
+
+    def __init__(self, workers=2, queue_limit=4, use_gevent=False):
+        self.workers = max(1, workers)
+        self.queue_limit = max(self.workers, queue_limit)
+        self.use_gevent = use_gevent
+
+        self._pending = 0
+        self._lock = threading.Lock()
+
+        if use_gevent:
+            from gevent.threadpool import ThreadPool
+            self._pool = ThreadPool(self.workers)
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='inference')
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def _done(self, _):
+        with self._lock:
+            self._pending -= 1
+
+    def _start(self, fn, args, bounded):
+        with self._lock:
+            if bounded and self._pending >= self.queue_limit:
+                raise ExecutorBusy(f"{self._pending} jobs in flight")
+            self._pending += 1
+
+        if self.use_gevent:
+            job = self._pool.spawn(fn, *args)
+            job.rawlink(self._done)
+        else:
+            job = self._pool.submit(fn, *args)
+            job.add_done_callback(self._done)
+        return job
+
+    def _wait(self, job):
+        return job.get() if self.use_gevent else job.result()
+
+    def run(self, fn, *args):
+        """Run fn on a worker and wait for its result"""
+        return self._wait(self._start(fn, args, bounded=False))
+
+    def try_run(self, fn, *args):
+        """Like run, but raise ExecutorBusy instead of queueing past queue_limit"""
+        return self._wait(self._start(fn, args, bounded=True))
+
+    def submit(self, fn, *args):
+        """Run fn on a worker in the background without waiting"""
+        return self._start(fn, args, bounded=False)
+
+    def map(self, fn, items):
+        """Run fn over items in parallel and return the results in order"""
+        jobs = [self._start(fn, (item,), bounded=False) for item in items]
+        return [self._wait(job) for job in jobs]
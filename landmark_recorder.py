@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+from gestures import GESTURE_CODES
+
+
+MAGIC = b'VBLMREC2'
+HANDEDNESS_CODES = {'Left': 0, 'Right': 1}
+
+# One fixed-size record per frame; frames without a hand have handedness -1 and NaN landmarks.
+# session tells apart the booths (connected clients) that share one recording.
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('session', '<u4'),
+    ('landmarks', '<f4', (21, 3)),
+    ('score', '<f4'),
+    ('handedness', 'i1'),
+    ('gesture', 'i1'),
+])
+HEADER = MAGIC + np.uint32(RECORD_DTYPE.itemsize).tobytes()
+
+
+class LandmarkRecorder:
+    """Appends per-frame landmarks to a compact binary file in chunks of chunk_size records,
+    or every flush_interval seconds, whichever comes first.
+
+    The file is a short header followed by packed RECORD_DTYPE records, so
+    load_recording can memory-map it without parsing.
+    """
+
+    def __init__(self, path, chunk_size=4096, flush_interval=5.0):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+        self._chunk = np.zeros(chunk_size, dtype=RECORD_DTYPE)
+        self._count = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(HEADER)
+            self._file.flush()
+        elif _read_header(path) != RECORD_DTYPE.itemsize:
+            self._file.close()
+            raise ValueError(f"{path} is not a compatible landmark recording")
+
+    def append(self, hand, gesture_name, timestamp=None, session=0):
+        """Record one frame; hand is (21 (x, y, z) points, handedness label, score) or None"""
+        with self._lock:
+            record = self._chunk[self._count]
+            record['timestamp'] = time.time() if timestamp is None else timestamp
+            record['session'] = session
+            record['gesture'] = GESTURE_CODES.get(gesture_name, 0)
+            if hand is None:
+                record['landmarks'] = np.nan
+                record['score'] = 0
+                record['handedness'] = -1
+            else:
+                points, handedness, score = hand
+                record['landmarks'] = points
+                record['score'] = score
+                record['handedness'] = HANDEDNESS_CODES.get(handedness, -1)
+
+            self._count += 1
+            if self._count == self.chunk_size or time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush()
+
+    def _flush(self):
+        if self._count:
+            self._file.write(self._chunk[:self._count].tobytes())
+            self._file.flush()
+            self._count = 0
+        self._last_flush = time.monotonic()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._flush()
+                self._file.close()
+
+
+def _read_header(path):
+    with open(path, 'rb') as f:
+        header = f.read(len(HEADER))
+    if len(header) != len(HEADER) or not header.startswith(MAGIC):
+        return None
+    return int(np.frombuffer(header[len(MAGIC):], dtype=np.uint32)[0])
+
+
+def load_recording(path):
+    """Memory-map a recording as a RECORD_DTYPE array (a partially written last record is ignored)"""
+    if _read_header(path) != RECORD_DTYPE.itemsize:
+        raise ValueError(f"{path} is not a compatible landmark recording")
+
+    count = (os.path.getsize(path) - len(HEADER)) // RECORD_DTYPE.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=len(HEADER), shape=(count,))
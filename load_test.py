@@ -0,0 +1,320 @@
+import argparse
+import base64
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+import psutil
+import socketio
+
+
+SCALE_FACTOR = 0.35
+JPEG_QUALITY = 50
+FRAME_INTERVAL = 0.2
+RESPONSE_TIMEOUT = 2.0
+SEND_TICK = 0.05
+
+
+def load_frames(source, scale, quality, limit):
+    """Load a recorded frame sequence (video file or image directory) as JPEG data URLs"""
+    images = []
+
+    if source and os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            img = cv2.imread(os.path.join(source, name), cv2.IMREAD_COLOR)
+            if img is not None:
+                images.append(img)
+            if len(images) >= limit:
+                break
+    elif source:
+        cap = cv2.VideoCapture(source)
+        while len(images) < limit:
+            ret, img = cap.read()
+            if not ret:
+                break
+            images.append(img)
+        cap.release()
+
+    if not images:
+        print("No frames loaded, falling back to blank synthetic frames (no gestures will be detected)")
+        images = [np.full((1080, 1920, 3), 127, np.uint8)]
+
+    frames = []
+    encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), quality]
+    for img in images:
+        small = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        success, buffer = cv2.imencode('.jpg', small, encode_param)
+        if success:
+            frames.append('data:image/jpeg;base64,' + base64.b64encode(buffer).decode('utf-8'))
+
+    success, buffer = cv2.imencode('.png', images[0])
+    capture = 'data:image/png;base64,' + base64.b64encode(buffer).decode('utf-8')
+
+    return frames, capture
+
+
+class SimulatedClient:
+    """One booth: replays frames through video_frame like index.html and uploads on trigger_capture"""
+
+    def __init__(self, url, frames, capture, interval, timeout, adaptive=False):
+        self.url = url
+        self.adaptive = adaptive
+        self.frames = frames
+        self.capture = capture
+        self.interval = interval
+        self.timeout = timeout
+
+        self.sio = socketio.Client(reconnection=False)
+        self.sio.on('state_update', self.on_state_update)
+
+        self.lock = threading.Lock()
+        self.in_flight = None
+        # Replies still owed for frames that timed out; discarded so they aren't timed against a newer frame
+        self.stale = 0
+        self.capture_triggered = False
+        self.stop_event = threading.Event()
+
+        self.latencies = []
+        self.sent = 0
+        self.received = 0
+        self.dropped = 0
+        self.timed_out = 0
+        self.late = 0
+        self.shed = 0
+        self.uploads = 0
+        self.errors = 0
+        self.started = None
+        self.finished = None
+
+    def on_state_update(self, data):
+        now = time.perf_counter()
+        with self.lock:
+            if self.stale:
+                self.stale -= 1
+                self.late += 1
+            elif self.in_flight is not None:
+                # Frames the server sheds at its queue limit come straight back unprocessed
+                if data.get('dropped'):
+                    self.shed += 1
+                else:
+                    self.latencies.append(now - self.in_flight)
+                    self.received += 1
+                self.in_flight = None
+
+        recommended = data.get('recommended')
+        if self.adaptive and recommended:
+            self.interval = recommended['interval'] / 1000
+
+        if data.get('trigger_capture') and not self.capture_triggered:
+            self.capture_triggered = True
+            self.sio.emit('save_photo', {'image': self.capture})
+            self.uploads += 1
+        elif not data.get('trigger_capture'):
+            self.capture_triggered = False
+
+    def run(self, duration):
+        try:
+            self.sio.connect(self.url, transports=['websocket'])
+        except Exception as e:
+            print(f"Client connect error: {e}")
+            self.errors += 1
+            return
+
+        self.started = time.perf_counter()
+        end = self.started + duration
+        last_send = 0
+        index = 0
+
+        while not self.stop_event.is_set():
+            now = time.perf_counter()
+            if now >= end:
+                break
+
+            if now - last_send >= self.interval:
+                with self.lock:
+                    if self.in_flight is not None and now - self.in_flight > self.timeout:
+                        self.timed_out += 1
+                        self.stale += 1
+                        self.in_flight = None
+
+                    busy = self.in_flight is not None
+                    if not busy:
+                        self.in_flight = now
+
+                if busy:
+                    self.dropped += 1
+                else:
+                    try:
+                        self.sio.emit('video_frame', {'image': self.frames[index % len(self.frames)]})
+                        self.sent += 1
+                        index += 1
+                    except Exception as e:
+                        print(f"Client send error: {e}")
+                        self.errors += 1
+                        break
+                last_send = now
+
+            time.sleep(SEND_TICK)
+
+        self.finished = time.perf_counter()
+        self.sio.disconnect()
+
+    def achieved_fps(self):
+        if not self.started or not self.finished:
+            return 0.0
+        return self.received / max(self.finished - self.started, 1e-6)
+
+
+class ServerMonitor:
+    """Samples CPU and RSS of the server process (including children) in the background"""
+
+    def __init__(self, pid, period=0.5):
+        self.process = psutil.Process(pid)
+        self.period = period
+        self.cpu = []
+        self.rss = []
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def _processes(self):
+        try:
+            return [self.process] + self.process.children(recursive=True)
+        except psutil.Error:
+            return []
+
+    def _sample(self):
+        for proc in self._processes():
+            try:
+                proc.cpu_percent(None)
+            except psutil.Error:
+                pass
+
+        while not self.stop_event.wait(self.period):
+            cpu = 0.0
+            rss = 0
+            for proc in self._processes():
+                try:
+                    cpu += proc.cpu_percent(None)
+                    rss += proc.memory_info().rss
+                except psutil.Error:
+                    pass
+            self.cpu.append(cpu)
+            self.rss.append(rss)
+
+    def start(self):
+        self.cpu, self.rss = [], []
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._sample, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+
+
+def run_level(url, concurrency, duration, frames, capture, interval, timeout, monitor, adaptive=False):
+    clients = [SimulatedClient(url, frames, capture, interval, timeout, adaptive) for _ in range(concurrency)]
+    threads = [threading.Thread(target=c.run, args=(duration,), daemon=True) for c in clients]
+
+    if monitor:
+        monitor.start()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(duration + timeout + 10)
+    if monitor:
+        monitor.stop()
+
+    latencies = np.array([lat for c in clients for lat in c.latencies]) * 1000
+    fps = [c.achieved_fps() for c in clients]
+
+    result = {
+        'clients': concurrency,
+        'sent': sum(c.sent for c in clients),
+        'received': sum(c.received for c in clients),
+        'dropped': sum(c.dropped for c in clients),
+        'timed_out': sum(c.timed_out for c in clients),
+        'late': sum(c.late for c in clients),
+        'shed': sum(c.shed for c in clients),
+        'uploads': sum(c.uploads for c in clients),
+        'errors': sum(c.errors for c in clients),
+        'fps_min': min(fps) if fps else 0.0,
+        'fps_mean': float(np.mean(fps)) if fps else 0.0,
+        'p50': float(np.percentile(latencies, 50)) if latencies.size else float('nan'),
+        'p90': float(np.percentile(latencies, 90)) if latencies.size else float('nan'),
+        'p99': float(np.percentile(latencies, 99)) if latencies.size else float('nan'),
+        'max': float(latencies.max()) if latencies.size else float('nan'),
+        'cpu_mean': float(np.mean(monitor.cpu)) if monitor and monitor.cpu else float('nan'),
+        'cpu_max': float(np.max(monitor.cpu)) if monitor and monitor.cpu else float('nan'),
+        'rss_mb': max(monitor.rss) / (1024 * 1024) if monitor and monitor.rss else float('nan'),
+    }
+    return result
+
+
+def print_report(results):
+    header = (f"{'clients':>7} {'p50ms':>8} {'p90ms':>8} {'p99ms':>8} {'maxms':>8} "
+              f"{'fps/min':>8} {'fps/avg':>8} {'sent':>7} {'dropped':>8} {'timeout':>8} {'late':>6} {'shed':>6} "
+              f"{'uploads':>8} {'cpu%':>7} {'cpu%max':>8} {'rssMB':>8}")
+    print("=" * len(header))
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['clients']:>7} {r['p50']:>8.1f} {r['p90']:>8.1f} {r['p99']:>8.1f} {r['max']:>8.1f} "
+              f"{r['fps_min']:>8.2f} {r['fps_mean']:>8.2f} {r['sent']:>7} {r['dropped']:>8} {r['timed_out']:>8} {r['late']:>6} {r['shed']:>6} "
+              f"{r['uploads']:>8} {r['cpu_mean']:>7.1f} {r['cpu_max']:>8.1f} {r['rss_mb']:>8.1f}")
+    print("=" * len(header))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic multi-client load test for the VisionBooth Socket.IO server")
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--frames', help="Video file or directory of images to replay")
+    parser.add_argument('--max-frames', type=int, default=300)
+    parser.add_argument('--clients', default='1,2,4,8', help="Comma-separated concurrency levels to ramp through")
+    parser.add_argument('--duration', type=float, default=20, help="Seconds per concurrency level")
+    parser.add_argument('--fps', type=float, default=1 / FRAME_INTERVAL, help="Target frame rate per client")
+    parser.add_argument('--scale', type=float, default=SCALE_FACTOR)
+    parser.add_argument('--quality', type=int, default=JPEG_QUALITY)
+    parser.add_argument('--timeout', type=float, default=RESPONSE_TIMEOUT)
+    parser.add_argument('--adaptive', action='store_true', help="Follow the server's recommended frame interval")
+    parser.add_argument('--server-pid', type=int, help="PID of an already running app.py to monitor")
+    parser.add_argument('--spawn', action='store_true', help="Start app.py as a subprocess and monitor it")
+    args = parser.parse_args()
+
+    frames, capture = load_frames(args.frames, args.scale, args.quality, args.max_frames)
+    print(f"Loaded {len(frames)} frames ({len(frames[0]) // 1024} KB first frame)")
+
+    server = None
+    pid = args.server_pid
+    if args.spawn:
+        server = subprocess.Popen([sys.executable, 'app.py'], cwd=os.path.dirname(os.path.abspath(__file__)))
+        pid = server.pid
+        time.sleep(5)
+
+    monitor = ServerMonitor(pid) if pid else None
+    levels = [int(n) for n in args.clients.split(',') if n.strip()]
+
+    results = []
+    try:
+        for level in levels:
+            print(f"Running {level} client(s) for {args.duration:.0f}s...")
+            results.append(run_level(args.url, level, args.duration, frames, capture,
+                                     1 / args.fps, args.timeout, monitor, args.adaptive))
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("Interrupted")
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    print_report(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+import argparse
+import time
+from collections import Counter
+
+import numpy as np
+
+import booth_state
+from gesture_rules import DEFAULT_THRESHOLDS, classify_landmarks_batch
+from gestures import GESTURES
+from landmark_recorder import load_recording
+
+
+CAPTURE_DELAY = 1.0
+
+
+def replay_state_machine(codes, timestamps, photos_per_strip=4):
+    """Run the booth state engine over gesture codes, simulating save_photo after every capture"""
+    engine = booth_state.BoothEngine(photos_per_strip=photos_per_strip, log=None)
+    state = engine.state
+    step = engine.step
+    names = booth_state.STATE_NAMES
+    stats = Counter()
+
+    for code, now in zip(codes.tolist(), timestamps.tolist()):
+        previous = state.state
+        step(code, now)
+        current = state.state
+        if current == previous:
+            continue
+
+        stats[f"{names[previous]} -> {names[current]}"] += 1
+        if current == booth_state.TIMER_SET:
+            stats[f"timer {state.timer_value}s"] += 1
+        elif current == booth_state.CAPTURE_DONE:
+            stats['captures'] += 1
+            if engine.capture_saved():
+                stats['strips'] += 1
+                engine.reset()
+            else:
+                engine.start_countdown(now + CAPTURE_DELAY)
+
+    return stats
+
+
+def replay_sessions(codes, timestamps, sessions, photos_per_strip=4):
+    """Replay every recorded session (booth) through its own state engine and sum the stats"""
+    stats = Counter()
+    for session in np.unique(sessions):
+        mask = sessions == session
+        stats.update(replay_state_machine(codes[mask], timestamps[mask], photos_per_strip))
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a landmark recording through the gesture classifier and booth state machine")
+    parser.add_argument('recordings', nargs='+')
+    parser.add_argument('--photos', type=int, default=4, help="Photos per strip")
+    for key, value in DEFAULT_THRESHOLDS.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", type=float, default=value)
+    args = parser.parse_args()
+
+    thresholds = {key: getattr(args, key) for key in DEFAULT_THRESHOLDS}
+
+    records = [load_recording(path) for path in args.recordings]
+    records = np.concatenate(records) if len(records) > 1 else records[0]
+    if len(records) == 0:
+        print("Recording is empty")
+        return
+    sessions = np.asarray(records['session'])
+    print(f"Loaded {len(records):,} frames from {len(np.unique(sessions))} session(s) "
+          f"spanning {records['timestamp'][-1] - records['timestamp'][0]:.0f}s")
+
+    start = time.perf_counter()
+    codes = classify_landmarks_batch(records['landmarks'], thresholds)
+    classify_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    stats = replay_sessions(codes, np.asarray(records['timestamp']), sessions, args.photos)
+    replay_time = time.perf_counter() - start
+
+    recorded = np.asarray(records['gesture'])
+    agreement = float(np.mean(codes == recorded)) * 100
+    recorded_counts = np.bincount(recorded, minlength=len(GESTURES))
+    replayed_counts = np.bincount(codes, minlength=len(GESTURES))
+
+    print(f"Thresholds: {thresholds}")
+    print(f"Classified in {classify_time:.2f}s ({len(codes) / max(classify_time, 1e-9):,.0f} frames/s)")
+    print(f"State machine in {replay_time:.2f}s ({len(codes) / max(replay_time, 1e-9):,.0f} frames/s)")
+    print(f"Agreement with recorded gestures: {agreement:.2f}%")
+
+    print(f"\n{'gesture':<15} {'recorded':>10} {'replayed':>10}")
+    for code, name in enumerate(GESTURES):
+        print(f"{name or 'None':<15} {recorded_counts[code]:>10,} {replayed_counts[code]:>10,}")
+
+    print("\nState machine:")
+    for key, value in sorted(stats.items()):
+        print(f"  {key:<40} {value:>8,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+import os
+import shutil
+import tarfile
+import time
+
+
+class RetentionManager:
+    """Incrementally cleans up the sessions directory.
+
+    Every step() looks at no more than batch_size sessions, continuing from
+    where the previous step stopped. It removes empty sessions, packs finished
+    sessions into compressed archives, and evicts the oldest sessions and
+    archives when the total size exceeds the quota. Active sessions are never
+    touched.
+    """
+
+    def __init__(self, root='sessions', archive_after=24 * 3600, empty_grace=600, quota_bytes=0,
+                 batch_size=20, archive_dir='archive', active_fn=None):
+        self.root = root
+        self.archive_after = archive_after
+        self.empty_grace = empty_grace
+        self.quota_bytes = quota_bytes
+        self.batch_size = batch_size
+        self.archive_root = os.path.join(root, archive_dir)
+        self.active_fn = active_fn or (lambda: ())
+
+        self._cursor = ''
+        self._sizes = {}
+
+    def _sessions(self):
+        names = []
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False) and entry.path != self.archive_root:
+                    names.append(entry.name)
+        return sorted(names)
+
+    def _archives(self):
+        if not os.path.isdir(self.archive_root):
+            return []
+        with os.scandir(self.archive_root) as entries:
+            return sorted(entry.name for entry in entries if entry.name.endswith('.tar.gz'))
+
+    def _scan(self, path):
+        """Return (file count, total bytes, newest mtime) of a session directory"""
+        count, size, newest = 0, 0, os.stat(path).st_mtime
+        for dirpath, _, filenames in os.walk(path):
+            for filename in filenames:
+                try:
+                    st = os.stat(os.path.join(dirpath, filename))
+                except OSError:
+                    continue
+                count += 1
+                size += st.st_size
+                newest = max(newest, st.st_mtime)
+        return count, size, newest
+
+    def _archive(self, name, path):
+        os.makedirs(self.archive_root, exist_ok=True)
+        target = os.path.join(self.archive_root, f"{name}.tar.gz")
+        tmp = target + '.tmp'
+        with tarfile.open(tmp, 'w:gz', compresslevel=6) as tar:
+            tar.add(path, arcname=name)
+        os.replace(tmp, target)
+        shutil.rmtree(path, ignore_errors=True)
+        return os.path.getsize(target)
+
+    def _evict(self, active, stats):
+        total = sum(self._sizes.values())
+        if not self.quota_bytes or total <= self.quota_bytes:
+            return
+
+        # Session and archive names both start with the session timestamp, so sorting by name is oldest first
+        for key in sorted(self._sizes, key=lambda k: k.split('/')[-1]):
+            if total <= self.quota_bytes or stats['evicted'] >= self.batch_size:
+                break
+            kind, name = key.split('/', 1)
+            if kind == 'session' and name in active:
+                continue
+
+            path = os.path.join(self.root, name) if kind == 'session' else os.path.join(self.archive_root, name)
+            try:
+                if kind == 'session':
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+            except OSError as e:
+                print(f"Retention: could not evict {path}: {e}")
+                continue
+
+            total -= self._sizes.pop(key)
+            stats['evicted'] += 1
+            print(f"Retention: evicted {path} (over quota)")
+
+    def step(self, now=None):
+        now = time.time() if now is None else now
+        active = {os.path.basename(os.path.normpath(p)) for p in self.active_fn() if p}
+        stats = {'scanned': 0, 'removed': 0, 'archived': 0, 'evicted': 0}
+
+        if not os.path.isdir(self.root):
+            return stats
+
+        sessions = self._sessions()
+        batch = [name for name in sessions if name > self._cursor][:self.batch_size]
+        self._cursor = batch[-1] if len(batch) == self.batch_size else ''
+
+        if not self._sizes:
+            for name in self._archives():
+                self._sizes[f"archive/{name}"] = os.path.getsize(os.path.join(self.archive_root, name))
+        known = set(sessions)
+        for key in [k for k in self._sizes if k.startswith('session/') and k[8:] not in known]:
+            del self._sizes[key]
+
+        for name in batch:
+            if name in active:
+                continue
+            path = os.path.join(self.root, name)
+            stats['scanned'] += 1
+            try:
+                count, size, newest = self._scan(path)
+
+                if count == 0:
+                    if now - newest >= self.empty_grace:
+                        shutil.rmtree(path)
+                        self._sizes.pop(f"session/{name}", None)
+                        stats['removed'] += 1
+                    continue
+
+                if self.archive_after and now - newest >= self.archive_after:
+                    self._sizes.pop(f"session/{name}", None)
+                    self._sizes[f"archive/{name}.tar.gz"] = self._archive(name, path)
+                    stats['archived'] += 1
+                    continue
+
+                self._sizes[f"session/{name}"] = size
+
+            except OSError as e:
+                print(f"Retention: skipping {path}: {e}")
+
+        self._evict(active, stats)
+        return stats
@@ -0,0 +1,162 @@
+import base64
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+
+MM_TO_INCH = 0.0393701
+
+# Declarative print layouts. Borders, spacing and the branding band are in pixels at the layout DPI,
+# photo slots fill the remaining area as a columns x rows grid.
+LAYOUTS = {
+    'strip_2x6': {
+        'width_mm': 51, 'height_mm': 152, 'dpi': 300,
+        'columns': 1, 'rows': 4,
+        'top_border': 60, 'side_border': 60, 'spacing': 40, 'bottom_area': 100,
+        'background': (255, 255, 255), 'font_size': 36,
+    },
+    'grid_4x6': {
+        'width_mm': 152, 'height_mm': 102, 'dpi': 300,
+        'columns': 2, 'rows': 2,
+        'top_border': 60, 'side_border': 60, 'spacing': 40, 'bottom_area': 140,
+        'background': (255, 255, 255), 'font_size': 48,
+    },
+    'postcard': {
+        'width_mm': 102, 'height_mm': 152, 'dpi': 300,
+        'columns': 1, 'rows': 2,
+        'top_border': 60, 'side_border': 60, 'spacing': 40, 'bottom_area': 140,
+        'background': (255, 255, 255), 'font_size': 48,
+    },
+}
+
+# Webcam captures are landscape; slots narrower than this would crop guests off the sides
+MIN_SLOT_ASPECT = 1.2
+
+FONT_PATHS = ["/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", "arial.ttf"]
+
+_slot_pool = None
+
+
+def get_layout(name):
+    if name not in LAYOUTS:
+        raise ValueError(f"Unknown strip layout: {name} (choose from {', '.join(LAYOUTS)})")
+    return LAYOUTS[name]
+
+
+@lru_cache(maxsize=None)
+def layout_geometry(name):
+    """Return ((width, height), [(x, y, slot_width, slot_height), ...]) in pixels"""
+    layout = get_layout(name)
+    width = int(layout['width_mm'] * MM_TO_INCH * layout['dpi'])
+    height = int(layout['height_mm'] * MM_TO_INCH * layout['dpi'])
+    columns, rows, spacing = layout['columns'], layout['rows'], layout['spacing']
+
+    slot_width = (width - layout['side_border'] * 2 - spacing * (columns - 1)) // columns
+    slot_height = (height - layout['top_border'] - layout['bottom_area'] - spacing * (rows - 1)) // rows
+    if slot_width / slot_height < MIN_SLOT_ASPECT:
+        raise ValueError(f"Layout {name} has {slot_width}x{slot_height}px slots, "
+                         f"narrower than the {MIN_SLOT_ASPECT} aspect of landscape captures")
+
+    slots = []
+    for row in range(rows):
+        for column in range(columns):
+            x = layout['side_border'] + column * (slot_width + spacing)
+            y = layout['top_border'] + row * (slot_height + spacing)
+            slots.append((x, y, slot_width, slot_height))
+
+    return (width, height), tuple(slots)
+
+
+def slot_count(name):
+    return len(layout_geometry(name)[1])
+
+
+@lru_cache(maxsize=8)
+def load_font(size):
+    for path in FONT_PATHS:
+        try:
+            return ImageFont.truetype(path, size)
+        except:
+            pass
+    return ImageFont.load_default()
+
+
+@lru_cache(maxsize=16)
+def render_background(name, date_text):
+    """Pre-render the frame and branding of a layout; cached per layout and day"""
+    layout = get_layout(name)
+    (width, height), _ = layout_geometry(name)
+
+    background = Image.new('RGB', (width, height), layout['background'])
+    draw = ImageDraw.Draw(background)
+    font = load_font(layout['font_size'])
+
+    branding_text = f"VisionBooth {date_text}"
+    bbox = draw.textbbox((0, 0), branding_text, font=font)
+    text_width = bbox[2] - bbox[0]
+    text_height = bbox[3] - bbox[1]
+
+    bottom_area = layout['bottom_area']
+    text_x = (width - text_width) // 2
+    text_y = height - bottom_area + (bottom_area - text_height) // 2
+
+    shadow_offset = 2
+    draw.text((text_x + shadow_offset, text_y + shadow_offset), branding_text, fill=(200, 200, 200), font=font)
+    draw.text((text_x, text_y), branding_text, fill=(50, 50, 50), font=font)
+
+    array = np.asarray(background).copy()
+    array.flags.writeable = False
+    return array
+
+
+def fit_photo(job):
+    """Decode a data URL, center-crop it to the slot aspect and downscale with area averaging (RGB)"""
+    img_data, slot_width, slot_height = job
+    img_bytes = base64.b64decode(img_data.split(',')[1])
+    photo = cv2.imdecode(np.frombuffer(img_bytes, np.uint8), cv2.IMREAD_COLOR)
+    if photo is None or photo.size == 0:
+        return None
+
+    photo_height, photo_width = photo.shape[:2]
+    target_aspect = slot_width / slot_height
+
+    if photo_width / photo_height > target_aspect:
+        new_width = int(photo_height * target_aspect)
+        left = (photo_width - new_width) // 2
+        photo = photo[:, left:left + new_width]
+    else:
+        new_height = int(photo_width / target_aspect)
+        top = (photo_height - new_height) // 2
+        photo = photo[top:top + new_height]
+
+    interpolation = cv2.INTER_AREA if photo.shape[1] >= slot_width else cv2.INTER_CUBIC
+    photo = cv2.resize(photo, (slot_width, slot_height), interpolation=interpolation)
+    return cv2.cvtColor(photo, cv2.COLOR_BGR2RGB)
+
+
+def _default_map(fn, items):
+    global _slot_pool
+    if _slot_pool is None:
+        _slot_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='strip')
+    return list(_slot_pool.map(fn, items))
+
+
+def compose_strip(images, name, map_fn=None, today=None):
+    """Composite up to slot_count(name) data-URL photos onto the cached layout background"""
+    today = today or datetime.date.today()
+    _, slots = layout_geometry(name)
+
+    canvas = render_background(name, today.strftime('%m/%d/%y')).copy()
+
+    jobs = [(img_data, w, h) for img_data, (_, _, w, h) in zip(images, slots)]
+    photos = (map_fn or _default_map)(fit_photo, jobs)
+
+    for photo, (x, y, w, h) in zip(photos, slots):
+        if photo is not None:
+            canvas[y:y + h, x:x + w] = photo
+
+    return Image.fromarray(canvas)